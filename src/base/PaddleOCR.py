@@ -1,28 +1,87 @@
-import base64
+import json
 import os
 import shutil
 import asyncio
+import aiofiles
 import httpx
 from typing import Optional, Dict, List, Any
 from loguru import logger
 
+try:
+    from ..utils import b64encode
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils import b64encode
+
+try:
+    # orjson 的序列化/反序列化由 C 实现，未安装时退回标准库
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    _json_loads = json.loads
+
 class PaddleOCRClient:
     """
     PaddleOCR 布局分析客户端封装
     """
     DEFAULT_API_URL = "https://j4x8mcmanbi1i7bd.aistudio-app.com/layout-parsing"
+    # 上传时每次读取的字节数，取 3 的倍数以保证分块 base64 编码可以直接拼接
+    UPLOAD_CHUNK_SIZE = 48 * 1024
+    # 下载图片时每次写入磁盘的字节数
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    DEFAULT_CONCURRENCY = 8
 
-    def __init__(self, api_url: Optional[str] = None, token: Optional[str] = None):
+    def __init__(self, api_url: Optional[str] = None, token: Optional[str] = None, concurrency: Optional[int] = None):
         """
         初始化客户端
         :param api_url: API 地址，默认使用环境变量 PADDLE_OCR_API_URL 或内置默认值
         :param token: API Token，默认使用环境变量 PADDLE_OCR_TOKEN 或内置默认值
+        :param concurrency: 图片下载最大并发数，默认使用环境变量 PADDLE_OCR_CONCURRENCY 或内置默认值
         """
         self.api_url = api_url or os.getenv("PADDLE_OCR_API_URL", self.DEFAULT_API_URL)
         self.token = token or os.getenv("PADDLE_OCR_TOKEN")
+        if concurrency is None:
+            concurrency = int(os.getenv("PADDLE_OCR_CONCURRENCY", self.DEFAULT_CONCURRENCY))
+        self.concurrency = concurrency
+        # 图片下载信号量与 HTTP 客户端一同按事件循环创建，同一循环内的所有 parse 共享
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # 延迟创建 HTTP 客户端，跨 parse 调用复用连接池
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
         
         if not self.token:
             raise ValueError("Token must be provided via argument or environment variable PADDLE_OCR_TOKEN")
+        if self.concurrency < 1:
+            # Semaphore(0) 会使所有图片下载永久阻塞
+            raise ValueError(f"Concurrency must be at least 1, got {self.concurrency}")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """懒加载 HTTP 客户端及下载信号量，事件循环变化时重新创建
+
+        客户端的连接绑定在创建它的事件循环上，持有本实例的调用方需在该循环结束前
+        await aclose() 关闭，否则循环切换后旧客户端的连接不会被释放。
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            # 旧客户端的连接绑定在已结束的事件循环上，无法复用，直接丢弃
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            self._client = httpx.AsyncClient(timeout=60.0, http2=True, limits=limits)
+            self._client_loop = loop
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._client
+
+    async def aclose(self):
+        """关闭复用的 HTTP 客户端，需在创建它的事件循环中调用才会真正关闭连接"""
+        client, self._client = self._client, None
+        if client is not None and self._client_loop is asyncio.get_running_loop():
+            await client.aclose()
+        self._client_loop = None
 
     async def parse(self, file_path: str, output_dir: str = "output", **kwargs) -> str:
         """
@@ -39,86 +98,131 @@ class PaddleOCRClient:
         file_name = os.path.splitext(os.path.basename(file_path))[0]
         output_dir = os.path.join(output_dir, file_name)
 
-        # 如果目录存在，先删除再创建
-        if os.path.exists(output_dir):
-            logger.warning(f"[PaddleOCR] Output directory {output_dir} exists. It will be removed and recreated.")
-            shutil.rmtree(output_dir)
-        os.makedirs(output_dir, exist_ok=True)
+        # 如果目录存在，先删除再创建；删除大量文件较慢，放到线程中执行
+        await asyncio.to_thread(self._reset_dir, output_dir)
 
         # 确定文件类型: 0 for PDF, 1 for images
         ext = os.path.splitext(file_path)[1].lower()
         file_type = 0 if ext == '.pdf' else 1
 
-        # 读取并编码文件
-        with open(file_path, "rb") as file:
-            file_bytes = file.read()
-            file_data = base64.b64encode(file_bytes).decode("ascii")
-
         headers = {
             "Authorization": f"token {self.token}",
             "Content-Type": "application/json"
         }
 
-        payload = {
-            "file": file_data,
+        options = {
             "fileType": file_type,
             "useDocOrientationClassify": kwargs.get("useDocOrientationClassify", False),
             "useDocUnwarping": kwargs.get("useDocUnwarping", False),
             "useChartRecognition": kwargs.get("useChartRecognition", False),
         }
 
-        logger.info(f"[PaddleOCR] Sending request to {self.api_url} for file {file_path}...")
+        # 请求体为 {"file": "<base64>", ...}，文件部分边读边编码，避免整份文件及其编码结果驻留内存
+        prefix = b'{"file":"'
+        suffix = b'",' + _json_dumps(options)[1:]
+        encoded_size = 4 * ((os.path.getsize(file_path) + 2) // 3)
+        headers["Content-Length"] = str(len(prefix) + encoded_size + len(suffix))
+
+        logger.info("[PaddleOCR] Sending request to {} for file {}...", self.api_url, file_path)
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(self.api_url, json=payload, headers=headers)
-            
-            if response.status_code != 200:
-                raise Exception(f"API request failed with status code {response.status_code}: {response.text}")
-
-            result = response.json().get("result", {})
-            if not result:
-                logger.warning("[PaddleOCR] No result found in response.")
-                return []
-
-            generated_files = []
-            full_markdown_texts = []
-
-            layout_results = result.get("layoutParsingResults", [])
-            for i, res in enumerate(layout_results):
-                text_content = res["markdown"]["text"]
-                full_markdown_texts.append(text_content)
-
-                # 保存 Markdown
-                md_filename = os.path.join(output_dir, f"doc_{i}.md")
-                with open(md_filename, "w", encoding="utf-8") as md_file:
-                    md_file.write(text_content)
-                generated_files.append(md_filename)
-                logger.debug(f"[PaddleOCR] Markdown document saved at {md_filename}")
-
-                # 保存 Markdown 中引用的图片
-                if "images" in res["markdown"]:
-                    await self._save_images(client, res["markdown"]["images"], output_dir)
-                
-                # 保存输出的分析图片
-                if "outputImages" in res:
-                    await self._save_remote_images(client, res["outputImages"], output_dir, suffix=f"_{i}")
+        client = self._get_client()
+        response = await client.post(
+            self.api_url,
+            content=self._iter_payload(file_path, prefix, suffix),
+            headers=headers,
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"API request failed with status code {response.status_code}: {response.text}")
+
+        result = _json_loads(response.content).get("result", {})
+        if not result:
+            logger.warning("[PaddleOCR] No result found in response.")
+            return []
+
+        layout_results = result.get("layoutParsingResults", [])
+        full_markdown_texts = [res["markdown"]["text"] for res in layout_results]
+
+        # 各页结果相互独立，并发处理；图片下载总并发仍受信号量限制
+        generated_files = list(await asyncio.gather(*(
+            self._handle_result(client, i, res, output_dir) for i, res in enumerate(layout_results)
+        )))
 
         # 保存合并后的 Markdown
         if full_markdown_texts:
             full_md_filename = os.path.join(output_dir, "doc.md")
-            with open(full_md_filename, "w", encoding="utf-8") as f:
-                f.write("\n\n".join(full_markdown_texts))
+            await asyncio.to_thread(self._write_text, full_md_filename, "\n\n".join(full_markdown_texts))
             generated_files.append(full_md_filename)
-            logger.info(f"[PaddleOCR] Full markdown document saved at {full_md_filename}")
+            logger.info("[PaddleOCR] Full markdown document saved at {}", full_md_filename)
 
         return output_dir
 
+    async def _handle_result(self, client: httpx.AsyncClient, index: int, res: Dict[str, Any], output_dir: str) -> str:
+        """保存单页结果的 Markdown 及其图片，返回 Markdown 文件路径"""
+        # 保存 Markdown，磁盘写入放到线程中与图片下载同时进行
+        md_filename = os.path.join(output_dir, f"doc_{index}.md")
+        tasks = [asyncio.to_thread(self._write_text, md_filename, res["markdown"]["text"])]
+
+        # 保存 Markdown 中引用的图片
+        if "images" in res["markdown"]:
+            tasks.append(self._save_images(client, res["markdown"]["images"], output_dir))
+
+        # 保存输出的分析图片
+        if "outputImages" in res:
+            tasks.append(self._save_remote_images(client, res["outputImages"], output_dir, suffix=f"_{index}"))
+
+        await asyncio.gather(*tasks)
+        logger.debug("[PaddleOCR] Markdown document saved at {}", md_filename)
+        return md_filename
+
+    @staticmethod
+    def _reset_dir(path: str):
+        """删除已存在的目录并重新创建"""
+        # 直接删除并忽略不存在的情况，省去 exists() 检查
+        try:
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            pass
+        else:
+            logger.warning("[PaddleOCR] Output directory {} existed. It was removed and recreated.", path)
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def _write_text(path: str, data: str):
+        """以 1MB 缓冲区写入文本文件，在线程中调用以免阻塞事件循环"""
+        with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            f.write(data)
+
+    async def _iter_payload(self, file_path: str, prefix: bytes, suffix: bytes):
+        """按块读取文件并生成 base64 编码后的 JSON 请求体"""
+        yield prefix
+        # 复用同一块读缓冲区，每个分块只分配一次编码结果
+        buffer = bytearray(self.UPLOAD_CHUNK_SIZE)
+        view = memoryview(buffer)
+        async with aiofiles.open(file_path, "rb") as file:
+            while size := await file.readinto(buffer):
+                yield b64encode(view[:size])
+        yield suffix
+
     async def _save_images(self, client: httpx.AsyncClient, images_map: Dict[str, str], output_dir: str):
         """下载并保存 Markdown 中的图片"""
+        targets = [(os.path.join(output_dir, img_path), img_url) for img_path, img_url in images_map.items()]
+        # 图片通常位于同一子目录（如 imgs/），每个目录只在线程中创建一次，而不是每张图片下载前各调用一次
+        directories = list({os.path.dirname(path) for path, _ in targets})
+        results = await asyncio.gather(
+            *(asyncio.to_thread(os.makedirs, directory, exist_ok=True) for directory in directories),
+            return_exceptions=True,
+        )
+        dir_errors = {d: r for d, r in zip(directories, results) if isinstance(r, Exception)}
+
         tasks = []
-        for img_path, img_url in images_map.items():
-            full_img_path = os.path.join(output_dir, img_path)
-            tasks.append(self._download_and_save(client, img_url, full_img_path))
+        for path, url in targets:
+            error = dir_errors.get(os.path.dirname(path))
+            if error is not None:
+                # 目录创建失败只影响其中的图片，与下载失败一样逐张记录，不中断整个解析
+                logger.error("[PaddleOCR] Failed to save image {}: {}", path, error)
+                continue
+            tasks.append(self._download_and_save(client, url, path))
         await asyncio.gather(*tasks)
 
     async def _save_remote_images(self, client: httpx.AsyncClient, images_map: Dict[str, str], output_dir: str, suffix: str = ""):
@@ -130,18 +234,22 @@ class PaddleOCRClient:
         await asyncio.gather(*tasks)
 
     async def _download_and_save(self, client: httpx.AsyncClient, url: str, save_path: str):
-        """通用下载保存方法"""
-        try:
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            response = await client.get(url)
-            if response.status_code == 200:
-                with open(save_path, "wb") as f:
-                    f.write(response.content)
-                logger.debug(f"[PaddleOCR] Image saved to: {save_path}")
-            else:
-                logger.error(f"[PaddleOCR] Failed to download image {url}, status code: {response.status_code}")
-        except Exception as e:
-            logger.error(f"[PaddleOCR] Failed to save image {save_path}: {e}")
+        """通用下载保存方法，save_path 所在目录需已存在"""
+        # 确保当前事件循环的信号量已创建，parse 之外直接调用时同样受并发限制
+        self._get_client()
+        async with self._semaphore:
+            try:
+                # 流式写入磁盘，避免整张图片缓存在内存中
+                async with client.stream("GET", url) as response:
+                    if response.status_code != 200:
+                        logger.error("[PaddleOCR] Failed to download image {}, status code: {}", url, response.status_code)
+                        return
+                    async with aiofiles.open(save_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(self.DOWNLOAD_CHUNK_SIZE):
+                            await f.write(chunk)
+                logger.debug("[PaddleOCR] Image saved to: {}", save_path)
+            except Exception as e:
+                logger.error("[PaddleOCR] Failed to save image {}: {}", save_path, e)
 
 if __name__ == "__main__":
     # 示例用法
@@ -151,9 +259,16 @@ if __name__ == "__main__":
     file_path = "data/PDF-example.pdf"
     if os.path.exists(file_path):
         client = PaddleOCRClient()
+
+        async def run_example():
+            try:
+                return await client.parse(file_path)
+            finally:
+                await client.aclose()
+
         try:
             # 使用 asyncio.run 运行异步方法
-            files = asyncio.run(client.parse(file_path))
+            files = asyncio.run(run_example())
             logger.success(f"[PaddleOCR] Successfully processed. Generated files: {files}")
         except Exception as e:
             logger.error(f"[PaddleOCR] Error processing file: {e}")
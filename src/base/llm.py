@@ -1,4 +1,5 @@
 import os
+import asyncio
 from typing import List, Dict, Optional, Union, Any
 
 from openai import OpenAI, AsyncOpenAI
@@ -6,6 +7,19 @@ from loguru import logger
 
 from .message import Message
 
+# 相同配置的 LLMClient 共享底层同步客户端，复用连接池与 TLS 会话
+# 值为 [客户端, 引用计数]，引用归零时关闭
+# 异步客户端的连接绑定在创建它的事件循环上，不跨实例共享
+_SYNC_POOL: Dict[tuple, list] = {}
+
+
+def _get_running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """返回当前运行中的事件循环，不在事件循环中时返回 None"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
 
 class LLMClient:
     """
@@ -44,32 +58,78 @@ class LLMClient:
         if not self.api_key:
             raise ValueError("必须提供 api_key 或设置 OPENAI_API_KEY 环境变量")
         
+        # 每次请求共用的参数模板
+        self._base_params: Dict[str, Any] = {"model": self.model, "temperature": self.temperature}
+        if self.max_tokens:
+            self._base_params["max_tokens"] = self.max_tokens
+        
         # 延迟创建客户端，按需初始化
         self._sync_client: Optional[OpenAI] = None
         self._async_client: Optional[AsyncOpenAI] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pool_key = self._make_pool_key()
+
+    def _make_pool_key(self) -> Optional[tuple]:
+        """生成共享客户端的键，额外参数不可哈希时返回 None 表示不共享"""
+        key = (self.base_url, self.api_key, self.timeout, frozenset(self.extra_kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _acquire(self, pool: Dict[tuple, list], client_cls: type) -> Any:
+        """从共享池获取客户端并增加引用计数"""
+        entry = pool.get(self._pool_key) if self._pool_key is not None else None
+        if entry is None:
+            entry = [
+                client_cls(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    timeout=self.timeout,
+                    **self.extra_kwargs
+                ),
+                0,
+            ]
+            if self._pool_key is not None:
+                pool[self._pool_key] = entry
+        entry[1] += 1
+        return entry[0]
+
+    def _release(self, pool: Dict[tuple, list], client: Any) -> bool:
+        """释放对共享客户端的引用，返回是否应由调用方关闭该客户端"""
+        entry = pool.get(self._pool_key) if self._pool_key is not None else None
+        if entry is None or entry[0] is not client:
+            return True
+        entry[1] -= 1
+        if entry[1] > 0:
+            return False
+        del pool[self._pool_key]
+        return True
     
     @property
     def sync_client(self) -> OpenAI:
         """懒加载同步客户端"""
         if self._sync_client is None:
-            self._sync_client = OpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url,
-                timeout=self.timeout,
-                **self.extra_kwargs
-            )
+            self._sync_client = self._acquire(_SYNC_POOL, OpenAI)
         return self._sync_client
     
     @property
     def async_client(self) -> AsyncOpenAI:
-        """懒加载异步客户端"""
-        if self._async_client is None:
+        """懒加载异步客户端，事件循环变化时重新创建
+
+        事件循环变化时旧客户端不会被关闭，调用方需在每个使用过它的事件循环结束前
+        await aclose()，否则其连接会一直保持到进程退出。
+        """
+        loop = _get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
             self._async_client = AsyncOpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url,
                 timeout=self.timeout,
                 **self.extra_kwargs
             )
+            self._async_loop = loop
         return self._async_client
     
     def _normalize_messages(self, messages: Union[List[Message], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
@@ -88,16 +148,7 @@ class LLMClient:
     
     def _build_request_params(self, messages: Union[List[Message], List[Dict[str, Any]]], **overrides) -> Dict:
         """构建请求参数"""
-        normalized_messages = self._normalize_messages(messages)
-        params = {
-            "model": self.model,
-            "messages": normalized_messages,
-            "temperature": self.temperature,
-        }
-        if self.max_tokens:
-            params["max_tokens"] = self.max_tokens
-        params.update(overrides)
-        return params
+        return {**self._base_params, "messages": self._normalize_messages(messages), **overrides}
     
     def chat(
         self, 
@@ -111,9 +162,9 @@ class LLMClient:
         :return: 模型回复内容
         """
         params = self._build_request_params(messages, **kwargs)
-        logger.debug(f"[大模型] 同步请求：{[msg.__str__() for msg in messages]}")
+        logger.opt(lazy=True).debug("[大模型] 同步请求：{}", lambda: [str(msg) for msg in messages])
         response = self.sync_client.chat.completions.create(**params)
-        logger.debug(f"[大模型] 同步响应：{response}")
+        logger.debug("[大模型] 同步响应：{}", response)
         assert response.choices[0].message is not None, "模型未返回消息内容"
         return Message.assistant(response.choices[0].message.content.strip())
     
@@ -129,9 +180,9 @@ class LLMClient:
         :return: 模型回复内容
         """
         params = self._build_request_params(messages, **kwargs)
-        logger.debug(f"[大模型] 异步请求：{[msg.__str__() for msg in messages]}")
+        logger.opt(lazy=True).debug("[大模型] 异步请求：{}", lambda: [str(msg) for msg in messages])
         response = await self.async_client.chat.completions.create(**params)
-        logger.debug(f"[大模型] 异步响应：{response}")
+        logger.debug("[大模型] 异步响应：{}", response)
         assert response.choices[0].message is not None, "模型未返回消息内容"
         return Message.assistant(response.choices[0].message.content.strip())
     
@@ -176,31 +227,18 @@ class LLMClient:
         return await self.achat(messages, **kwargs)
     
     def close(self):
-        """关闭客户端连接"""
-        if self._sync_client:
-            self._sync_client.close()
-        if self._async_client:
-            # AsyncOpenAI 使用 aclose()，兼容无事件循环/有事件循环两种情况
-            import asyncio
-
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = None
+        """释放同步客户端连接，异步客户端需在事件循环中调用 aclose() 释放"""
+        sync_client, self._sync_client = self._sync_client, None
+        if sync_client and self._release(_SYNC_POOL, sync_client):
+            sync_client.close()
 
-            if loop is not None and loop.is_running():
-                # 在已有事件循环中，调度关闭任务
-                loop.create_task(self._async_client.close())
-            else:
-                # 无事件循环时，临时创建一个执行关闭
-                asyncio.run(self._async_client.close())
-    
-    def __del__(self):
-        """析构时清理资源"""
-        try:
-            self.close()
-        except Exception:
-            pass
+    async def aclose(self):
+        """释放全部客户端连接，异步客户端需在创建它的事件循环中调用才会真正关闭"""
+        self.close()
+        async_client, self._async_client = self._async_client, None
+        if async_client is not None and self._async_loop is asyncio.get_running_loop():
+            await async_client.close()
+        self._async_loop = None
 
 if __name__ == "__main__":
     # 调用示例
@@ -212,4 +250,5 @@ if __name__ == "__main__":
         system_prompt="You are a helpful assistant.",
         user_message="Hello, how are you?"
     )
-    logger.info(f"模型回复：{response}")
\ No newline at end of file
+    logger.info(f"模型回复：{response}")
+    llm_client.close()
\ No newline at end of file
@@ -1,7 +1,7 @@
 """消息系统"""
 from typing import Optional, Dict, Any, Literal, Union, List
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 class ImageUrl(BaseModel):
     """图片链接详情"""
@@ -32,6 +32,26 @@ class Message(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
 
+    # 序列化结果缓存，内容变化时失效
+    _openai_cache: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    _str_cache: Optional[str] = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in ("role", "content"):
+            self._invalidate_cache()
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "Message":
+        # update 不经过 __setattr__，且私有缓存会被一并复制，副本需从空缓存开始
+        copied = super().model_copy(update=update, deep=deep)
+        copied._invalidate_cache()
+        return copied
+
+    def _invalidate_cache(self):
+        """清除序列化缓存"""
+        self._openai_cache = None
+        self._str_cache = None
+
     # --- 工厂方法 (Factory Methods) ---
     
     @classmethod
@@ -54,6 +74,7 @@ class Message(BaseModel):
         # 此时 self.content 必定是 list，类型检查器可能需要显式提示，但在运行时是安全的
         if isinstance(self.content, list):
             self.content.append(TextContent(text=text))
+        self._invalidate_cache()
         return self
 
     def add_image(
@@ -68,6 +89,7 @@ class Message(BaseModel):
             self.content.append(
                 ImageContent(image_url=ImageUrl(url=url, detail=detail, display_url=display_url))
             )
+        self._invalidate_cache()
         return self
 
     def _ensure_list_mode(self):
@@ -80,15 +102,23 @@ class Message(BaseModel):
     def to_openai_dict(self) -> Dict[str, Any]:
         """
         转换为 OpenAI API 兼容的字典
-        利用 Pydantic V2 的 model_dump 自动处理递归序列化
+        利用 Pydantic V2 的 model_dump 自动处理递归序列化，结果缓存至内容变化；
+        返回缓存的浅拷贝，调用方修改顶层键不会污染缓存
         """
-        return self.model_dump(
-            mode='json', 
-            include={'role', 'content'}, 
-            exclude_none=True
-        )
+        if self._openai_cache is None:
+            self._openai_cache = self.model_dump(
+                mode='json', 
+                include={'role', 'content'}, 
+                exclude_none=True
+            )
+        return dict(self._openai_cache)
 
     def __str__(self) -> str:
+        if self._str_cache is None:
+            self._str_cache = self._build_display_str()
+        return self._str_cache
+
+    def _build_display_str(self) -> str:
         if isinstance(self.content, str):
             display_str = self.content
         else:
@@ -99,7 +129,7 @@ class Message(BaseModel):
                 elif isinstance(item, ImageContent):
                     raw_url = item.image_url.url
                     display_url = item.image_url.display_url or raw_url
-                    if not (display_url.startswith("http://") or display_url.startswith("https://")):
+                    if not display_url.startswith(("http://", "https://")):
                         if len(display_url) > 64:
                             display_url = display_url[:30] + "..." + display_url[-10:]
                     parts.append(f"[IMAGE: {display_url}]")
@@ -22,11 +22,18 @@ chunk_builder = MarkdownChunkBuilder()
 _latest_context: dict[str, Any] = {}
 ocr: PaddleOCRClient | None = None
 summarization_agent: DocumentSummarizationAgent | None = None
+# Gradio 执行异步回调的事件循环，复用的 HTTP 客户端连接绑定在该循环上，只能在其中关闭
+_handler_loop: asyncio.AbstractEventLoop | None = None
+
+def _track_handler_loop():
+    global _handler_loop
+    _handler_loop = asyncio.get_running_loop()
 
 async def _parse_pdf_async(file):
     if not file:
         return "请先上传文件"
     
+    _track_handler_loop()
     start_time = time.time()
     file_path = file.name if hasattr(file, 'name') else file
     global _latest_context
@@ -41,13 +48,14 @@ async def _parse_pdf_async(file):
         pdf_name = os.path.basename(abs_output_dir)
         output_root = os.path.dirname(abs_output_dir) or "."
 
+        # Gradio 在事件循环中直接执行异步回调，读取文件与切片等阻塞操作放到线程池
         builder = MarkdownDocumentBuilder(output_root=output_root)
-        document = builder.build(pdf_name)
+        document = await asyncio.to_thread(builder.build, pdf_name)
         if document.metadata is None:
             document.metadata = {}
         document.metadata["output_dir"] = abs_output_dir
 
-        cleaned_document = reference_cleaner.run(document)
+        cleaned_document = await reference_cleaner.arun(document)
         processed_document = Document(
             content=cleaned_document.content,
             metadata=dict(cleaned_document.metadata or {}),
@@ -55,7 +63,7 @@ async def _parse_pdf_async(file):
         )
         processed_document.metadata["output_dir"] = abs_output_dir
 
-        chunks = chunk_builder.split(processed_document)
+        chunks = await asyncio.to_thread(chunk_builder.split, processed_document)
 
         _latest_context = {
             "output_dir": abs_output_dir,
@@ -73,10 +81,8 @@ async def _parse_pdf_async(file):
     except Exception as e:
         return f"❌ 解析出错: {str(e)}"
 
-def parse_pdf_sync(file):
-    return asyncio.run(_parse_pdf_async(file))
-
 async def _summarize_md_async(md_content):
+    _track_handler_loop()
     start_time = time.time()
     if summarization_agent is None:
         return "❌ 总结代理未初始化"
@@ -129,15 +135,40 @@ async def _summarize_md_async(md_content):
     except Exception as exc:
         return f"❌ 总结出错: {str(exc)}"
 
-def summarize_md_sync(md_content):
-    return asyncio.run(_summarize_md_async(md_content))
+async def _aclose_clients():
+    if ocr is not None:
+        await ocr.aclose()
+    if summarization_agent is not None:
+        await summarization_agent.llm.aclose()
+
+def _close_clients():
+    """在 Gradio 事件循环停止前，把客户端的关闭调度到该循环中执行"""
+    loop = _handler_loop
+    if loop is None or not loop.is_running():
+        # 没有处理过请求，异步客户端从未创建，只需释放同步客户端
+        if summarization_agent is not None:
+            summarization_agent.llm.close()
+        return
+    asyncio.run_coroutine_threadsafe(_aclose_clients(), loop).result(timeout=10)
 
 if __name__ == "__main__":
     ocr = PaddleOCRClient()
     summarization_agent = DocumentSummarizationAgent()
     
+    # 直接交给 Gradio 在其常驻事件循环中执行异步回调，HTTP 客户端得以跨请求复用连接
     demo = create_demo(
-        parse_func=parse_pdf_sync,
-        summarize_func=summarize_md_sync
+        parse_func=_parse_pdf_async,
+        summarize_func=_summarize_md_async
     )
-    demo.launch()
\ No newline at end of file
+    # 不让 launch 阻塞主线程：Ctrl+C 时先在仍在运行的事件循环中关闭客户端，再停止服务
+    demo.launch(prevent_thread_lock=True)
+    try:
+        while True:
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            _close_clients()
+        finally:
+            demo.close()
\ No newline at end of file
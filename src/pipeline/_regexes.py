@@ -0,0 +1,18 @@
+"""Pipeline 共用的预编译正则表达式。"""
+from __future__ import annotations
+
+import re
+
+# 编号章节标题（如 `## 1.`、`### 2`，不匹配 `## 1.1`）或 <img> 标签，供切片时一次扫描
+HEADING_NUMBERED_OR_IMG = re.compile(
+    r"(?m)(?P<heading>^[^\S\n]{0,3}###?[^\S\n]+\d+(?:\.(?!\d))?(?=\s))"
+    r"|<img[^>]+src=['\"](?P<img>[^'\"]+)['\"]",
+    re.IGNORECASE,
+)
+
+# 二、三级标题，捕获标题文本
+# 标题模式不能使用 re.ASCII：OCR 输出常用全角空格（U+3000）分隔标题标记与文字
+HEADING_TITLE = re.compile(r"(?m)^\s{0,3}###?\s+([^\n]+)$")
+
+# <img> 标签的 src 属性；标签语法为纯 ASCII，可使用 re.ASCII
+IMG_SRC = re.compile(r"<img[^>]+src=['\"]([^'\"]+)['\"]", re.IGNORECASE | re.ASCII)
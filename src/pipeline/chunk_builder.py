@@ -1,20 +1,20 @@
 from __future__ import annotations
 
-import re
+import os
 from pathlib import Path
 from typing import List
 
 from loguru import logger
 
 try:
-    from ..utils import img2base64
+    from ._regexes import HEADING_NUMBERED_OR_IMG
     from .document_builder import MarkdownDocumentBuilder
     from .document import Document, DocumentChunk, ImageData
 except ImportError:
     import sys
 
     sys.path.append(str(Path(__file__).resolve().parents[1]))
-    from utils import img2base64
+    from pipeline._regexes import HEADING_NUMBERED_OR_IMG
     from pipeline.document_builder import MarkdownDocumentBuilder
     from pipeline.document import Document, DocumentChunk, ImageData
 
@@ -22,10 +22,7 @@ except ImportError:
 class MarkdownChunkBuilder:
     """根据标题拆分 Markdown 文本并生成 DocumentChunk 列表。"""
 
-    _HEADING_PATTERN = re.compile(
-        r"(?m)^\s{0,3}###?\s+(\d+)(?:\.(?!\d))?(?=\s)",
-    )
-    _IMG_PATTERN = re.compile(r"<img[^>]+src=['\"]([^'\"]+)['\"]", re.IGNORECASE)
+    _SCAN_PATTERN = HEADING_NUMBERED_OR_IMG
 
     def split(self, document: Document) -> List[DocumentChunk]:
         """按规则切片 Document，并返回 DocumentChunk 列表。"""
@@ -34,70 +31,83 @@ class MarkdownChunkBuilder:
             logger.warning("[Chunker] 文档内容为空，跳过切片")
             return []
 
-        matches = list(self._HEADING_PATTERN.finditer(content))
         chunks: List[DocumentChunk] = []
+        # 构建器已在 metadata 中记录解析后的绝对路径，仅在缺失时才调用 resolve()
         image_abs_map = {
-            Path(img.path).resolve(): img for img in (document.images or []) if img.path
+            Path(img.metadata.get("resolved_path") or Path(img.path).resolve()): img
+            for img in (document.images or [])
+            if img.path
         }
         image_rel_map = {
             img.metadata.get("relative_path"): img
             for img in (document.images or [])
             if img.metadata.get("relative_path")
         }
-
-        def add_chunk(text: str) -> None:
+        image_by_name: dict[str, list[ImageData]] = {}
+        for abs_path, img in image_abs_map.items():
+            image_by_name.setdefault(abs_path.name, []).append(img)
+        # 同一图片常被多个 chunk 引用，本次切片内缓存解析结果，避免重复查找和编码
+        resolved_cache: dict[str, ImageData | None] = {}
+        base_dir = (document.metadata or {}).get("output_dir")
+
+        def add_chunk(text: str, image_srcs: List[str]) -> None:
             normalized = text.strip()
             if not normalized:
                 return
             chunk = DocumentChunk(
                 content=normalized,
-                metadata={},
                 doc_id=document.doc_id,
                 chunk_index=len(chunks),
-                images=self._collect_images(normalized, image_abs_map, image_rel_map),
+                images=self._collect_images(
+                    image_srcs, image_abs_map, image_rel_map, image_by_name, resolved_cache, base_dir
+                ),
             )
             chunks.append(chunk)
 
-        if not matches:
-            add_chunk(content)
+        # 单次扫描同时定位切片标题与图片引用：遇到标题即结束上一块，图片归入当前块
+        section_start = 0
+        section_images: List[str] = []
+        has_heading = False
+        for match in self._SCAN_PATTERN.finditer(content):
+            src = match.group("img")
+            if src is not None:
+                section_images.append(src)
+                continue
+            has_heading = True
+            add_chunk(content[section_start:match.start()], section_images)
+            section_start = match.start()
+            section_images = []
+        add_chunk(content[section_start:], section_images)
+
+        if not has_heading:
             logger.info("[Chunker] 未匹配到切片标题，返回整体文档作为单块")
             return chunks
 
-        first_start = matches[0].start()
-        if first_start > 0:
-            add_chunk(content[:first_start])
-
-        for idx, match in enumerate(matches):
-            start = match.start()
-            end = matches[idx + 1].start() if idx + 1 < len(matches) else len(content)
-            add_chunk(content[start:end])
-
         logger.info("[Chunker] 切片完成，共生成 {} 个文档块", len(chunks))
         return chunks
 
     def _collect_images(
         self,
-        chunk_content: str,
+        image_srcs: List[str],
         image_abs_map: dict[Path, ImageData],
         image_rel_map: dict[str, ImageData],
+        image_by_name: dict[str, list[ImageData]],
+        resolved_cache: dict[str, ImageData | None],
+        base_dir: str | None = None,
     ) -> List[ImageData]:
         """根据 chunk 内引用的图片路径收集图像。"""
         result: List[ImageData] = []
-        if not chunk_content:
-            return result
-
-        relative_paths = {
-            path.strip()
-            for path in self._IMG_PATTERN.findall(chunk_content)
-            if path.strip()
-        }
+        relative_paths = {path.strip() for path in image_srcs if path.strip()}
 
         for rel_path in relative_paths:
-            image = self._resolve_image(rel_path, image_abs_map, image_rel_map)
-            if image:
-                result.append(
-                    ImageData(data=image.data, metadata=dict(image.metadata or {}), path=image.path)
+            if rel_path not in resolved_cache:
+                resolved_cache[rel_path] = self._resolve_image(
+                    rel_path, image_abs_map, image_rel_map, image_by_name, base_dir
                 )
+            image = resolved_cache[rel_path]
+            if image:
+                # 直接共享同一 ImageData，各块复用原始字节与已生成的 Base64 缓存
+                result.append(image)
 
         return result
 
@@ -106,26 +116,32 @@ class MarkdownChunkBuilder:
         rel_path: str,
         image_abs_map: dict[Path, ImageData],
         image_rel_map: dict[str, ImageData],
+        image_by_name: dict[str, list[ImageData]],
+        base_dir: str | None = None,
     ) -> ImageData | None:
         if rel_path in image_rel_map:
             return image_rel_map[rel_path]
 
-        abs_candidates = [Path(rel_path).resolve()]
-        abs_candidates.extend(
-            path for path in image_abs_map.keys() if path.name == Path(rel_path).name
-        )
-
-        for abs_path in abs_candidates:
-            if abs_path in image_abs_map:
-                return image_abs_map[abs_path]
-
         candidate_path = Path(rel_path)
-        if candidate_path.exists():
-            base64_data = img2base64(str(candidate_path))
-            metadata = {"relative_path": candidate_path.name}
-            return ImageData(data=base64_data, metadata=metadata, path=str(candidate_path))
-
-        return None
+        same_name = image_by_name.get(candidate_path.name)
+        if same_name:
+            # 仅在文件名重复时才需要绝对路径来区分；已知文档目录时按字符串拼接，免去 resolve() 的文件系统调用
+            if len(same_name) > 1:
+                if base_dir:
+                    abs_path = Path(os.path.normpath(os.path.join(base_dir, rel_path)))
+                else:
+                    abs_path = candidate_path.resolve()
+                image = image_abs_map.get(abs_path)
+                if image:
+                    return image
+            return same_name[0]
+
+        try:
+            raw = candidate_path.read_bytes()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        metadata = {"relative_path": candidate_path.name}
+        return ImageData(raw=raw, metadata=metadata, path=str(candidate_path))
 
 
 if __name__ == "__main__":
@@ -1,16 +1,46 @@
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
 import hashlib
 
-@dataclass
+try:
+    # blake3 有 SIMD 加速，未安装时退回同为 C 实现的 blake2b
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    from ..utils import b64encode_as_string
+except ImportError:
+    import sys
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from utils import b64encode_as_string
+
+
+def _content_hash(*parts: str) -> str:
+    """按顺序哈希各部分文本，返回 32 位十六进制摘要"""
+    hasher = blake3() if blake3 is not None else hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(part.encode("utf-8", "surrogatepass"))
+    return hasher.hexdigest(length=16) if blake3 is not None else hasher.hexdigest()
+
+@dataclass(slots=True)
 class ImageData:
-    """图片数据类"""
-    data: str
+    """图片数据类，保存原始字节，Base64 编码在首次访问 data 时生成并缓存"""
+    raw: bytes
     metadata: Dict[str, Any]
     path: str
+    _b64: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def data(self) -> str:
+        """图片的 Base64 编码字符串"""
+        if self._b64 is None:
+            self._b64 = b64encode_as_string(self.raw)
+        return self._b64
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     """文档类"""
     content: str
@@ -20,13 +50,13 @@ class Document:
 
     def __post_init__(self):
         if self.doc_id is None:
-            self.doc_id = hashlib.md5(self.content.encode()).hexdigest()
+            self.doc_id = _content_hash(self.content)
 
-@dataclass
+@dataclass(slots=True)
 class DocumentChunk:
     """文档块类"""
     content: str
-    metadata: Dict[str, Any]
+    metadata: Dict[str, Any] = field(default_factory=dict)
     chunk_id: Optional[str] = None
     doc_id: Optional[str] = None
     chunk_index: int = 0
@@ -34,5 +64,4 @@ class DocumentChunk:
 
     def __post_init__(self):
         if self.chunk_id is None:
-            chunk_content = f"{self.doc_id}_{self.chunk_index}_{self.content[:50]}"
-            self.chunk_id = hashlib.md5(chunk_content.encode()).hexdigest()
+            self.chunk_id = _content_hash(f"{self.doc_id}_{self.chunk_index}_", self.content[:50])
@@ -1,26 +1,29 @@
 from __future__ import annotations
 
-import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from loguru import logger
 
 try:
-    from ..utils import img2base64
+    from ._regexes import IMG_SRC
     from .document import Document, ImageData
 except ImportError:
     import sys
 
     sys.path.append(str(Path(__file__).resolve().parents[1]))
-    from utils import img2base64
+    from pipeline._regexes import IMG_SRC
     from pipeline.document import Document, ImageData
 
 
 class MarkdownDocumentBuilder:
     """将 OCR 生成的 doc.md 与图片整理为 Document 对象。"""
 
-    _IMG_PATTERN = re.compile(r"<img[^>]+src=['\"]([^'\"]+)['\"]", re.IGNORECASE)
+    _IMG_PATTERN = IMG_SRC
+    # 待读取图片少于该数量时串行处理，避免线程池开销
+    _PARALLEL_THRESHOLD = 4
+    _MAX_WORKERS = 8
 
     def __init__(self, output_root: Optional[str] = None) -> None:
         default_root = Path(__file__).resolve().parents[2] / "PDF_Extraction"
@@ -29,10 +32,10 @@ class MarkdownDocumentBuilder:
     def build(self, pdf_name: str) -> Document:
         target_dir = self.output_root / pdf_name
         doc_path = target_dir / "doc.md"
-        if not doc_path.exists():
-            raise FileNotFoundError(f"doc.md not found for {pdf_name}: {doc_path}")
-
-        content = doc_path.read_text(encoding="utf-8")
+        try:
+            content = doc_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise FileNotFoundError(f"doc.md not found for {pdf_name}: {doc_path}") from None
         images = self._gather_images(content, target_dir)
 
         document = Document(content=content, metadata={}, images=images)
@@ -40,25 +43,40 @@ class MarkdownDocumentBuilder:
         return document
 
     def _gather_images(self, content: str, target_dir: Path) -> List[ImageData]:
-        seen = set()
-        images: List[ImageData] = []
-        for match in self._IMG_PATTERN.finditer(content):
-            relative_src = match.group(1)
-            if relative_src in seen:
-                continue
-            seen.add(relative_src)
-
-            image_path = (target_dir / relative_src).resolve()
-            if not image_path.exists():
-                logger.warning("[Builder] 图片未找到，跳过: {}", image_path)
-                continue
-
-            base64_data = img2base64(str(image_path))
-            metadata = {"relative_path": relative_src}
-            images.append(ImageData(data=base64_data, metadata=metadata, path=str(image_path)))
-
-        return images
-
+        # dict.fromkeys 在去重的同时保留首次出现的顺序
+        found = [
+            (relative_src, (target_dir / relative_src).resolve())
+            for relative_src in dict.fromkeys(self._IMG_PATTERN.findall(content))
+        ]
+        # 不同写法的引用可能指向同一文件，按绝对路径去重后每个文件只读取一次
+        raw_by_path = self._load_images(list(dict.fromkeys(path for _, path in found)))
+
+        return [
+            ImageData(
+                raw=raw_by_path[image_path],
+                metadata={"relative_path": relative_src, "resolved_path": str(image_path)},
+                path=str(image_path),
+            )
+            for relative_src, image_path in found
+            if raw_by_path[image_path] is not None
+        ]
+
+    def _load_images(self, paths: List[Path]) -> Dict[Path, Optional[bytes]]:
+        """读取图片原始字节，数量较多时用线程池并行读取；缺失的图片记为 None"""
+        if len(paths) < self._PARALLEL_THRESHOLD:
+            loaded = [self._read_image(path) for path in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self._MAX_WORKERS, len(paths))) as executor:
+                loaded = list(executor.map(self._read_image, paths))
+        return dict(zip(paths, loaded))
+
+    @staticmethod
+    def _read_image(path: Path) -> Optional[bytes]:
+        try:
+            return path.read_bytes()
+        except (FileNotFoundError, NotADirectoryError):
+            logger.warning("[Builder] 图片未找到，跳过: {}", path)
+            return None
 
 if __name__ == "__main__":
     sample_dir = Path(__file__).resolve().parents[2] / "PDF_Extraction"
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import shutil
 from datetime import datetime
 from pathlib import Path
@@ -23,6 +24,8 @@ class PaddleOCROutputProcessor:
     
     """调用 PaddleOCR 并保留 doc.md 与 imgs 的简单封装。"""
 
+    _KEEP_NAMES = frozenset({"doc.md", "imgs"})
+
     def __init__(
         self,
         client: Optional[PaddleOCRClient] = None,
@@ -43,11 +46,14 @@ class PaddleOCROutputProcessor:
         logger.info("[Pipeline] PaddleOCR 开始处理 {}", source_path)
 
         await self.client.parse(str(source_path), output_dir=str(self.output_root))
-        self._clean_outputs(target_dir)
+        # 目录清理与文件读取均为阻塞 IO，放到线程池执行，避免阻塞事件循环
+        await asyncio.to_thread(self._clean_outputs, target_dir)
 
         doc_path = target_dir / "doc.md"
-        if not doc_path.exists():
-            raise FileNotFoundError(f"doc.md not found: {doc_path}")
+        try:
+            content = await asyncio.to_thread(doc_path.read_text, encoding="utf-8")
+        except FileNotFoundError:
+            raise FileNotFoundError(f"doc.md not found: {doc_path}") from None
 
         metadata = {
             "source_pdf": str(source_path),
@@ -56,37 +62,47 @@ class PaddleOCROutputProcessor:
         }
 
         logger.info("[Pipeline] PaddleOCR 处理完成，结果位于 {}", target_dir)
-        return Document(content=doc_path.read_text(encoding="utf-8"), metadata=metadata)
+        return Document(content=content, metadata=metadata)
 
     def _clean_outputs(self, target_dir: Path) -> None:
         """删除单页 Markdown、布局图和解析 JSON，仅保留 doc.md 与 imgs。"""
-        if not target_dir.exists():
+        # 除 doc.md 与 imgs 外的条目（单页 Markdown、JSON、布局图及其他）一律删除，
+        # 先单次扫描收集，再统一删除，避免边遍历边修改目录
+        to_unlink: list[str] = []
+        to_rmtree: list[str] = []
+        try:
+            entries = os.scandir(target_dir)
+        except FileNotFoundError:
             return
-
-        parsed_json = target_dir / "parsed_data_v2.json"
-        if parsed_json.exists():
-            parsed_json.unlink()
-
-        for item in target_dir.iterdir():
-            if item.name == "doc.md" or item.name == "imgs":
-                continue
-            if item.suffix == ".md" and item.name.startswith("doc_"):
-                item.unlink()
-                continue
-            if item.suffix.lower() == ".json":
-                item.unlink()
-                continue
-            if item.suffix.lower() in {".jpg", ".png"} and item.name.startswith("layout_det_res"):
-                item.unlink()
-                continue
-            if item.is_dir() and item.name != "imgs":
-                shutil.rmtree(item)
-            elif item.is_file() and item.name != "doc.md":
-                item.unlink()
+        with entries:
+            for entry in entries:
+                if entry.name in self._KEEP_NAMES:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    to_rmtree.append(entry.path)
+                else:
+                    to_unlink.append(entry.path)
+
+        for path in to_unlink:
+            os.unlink(path)
+        for path in to_rmtree:
+            shutil.rmtree(path)
+
+    async def aclose(self) -> None:
+        """关闭 OCR 客户端复用的连接，需在调用 run 的事件循环中调用。"""
+        await self.client.aclose()
 
     def run_sync(self, pdf_path: str) -> Document:
         """同步入口，方便在无事件循环环境中调用。"""
-        return asyncio.run(self.run(pdf_path))
+
+        async def _run() -> Document:
+            # asyncio.run 结束后事件循环即关闭，客户端需在同一循环内关闭
+            try:
+                return await self.run(pdf_path)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(_run())
 
 
 if __name__ == "__main__":
@@ -97,7 +113,10 @@ if __name__ == "__main__":
 
     async def demo() -> None:
         processor = PaddleOCROutputProcessor()
-        document = await processor.run(str(sample_pdf))
+        try:
+            document = await processor.run(str(sample_pdf))
+        finally:
+            await processor.aclose()
         logger.success("[Pipeline] 文档处理完成，长度 {}", len(document.content))
 
     if sample_pdf.exists():
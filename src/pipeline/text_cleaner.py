@@ -1,50 +1,73 @@
 from __future__ import annotations
 
-import re
+import asyncio
 from pathlib import Path
 from typing import Iterable
 
 from loguru import logger
 
 try:
+    from ._regexes import HEADING_TITLE
     from .document import Document
 except ImportError:
     import sys
 
     sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from pipeline._regexes import HEADING_TITLE
     from pipeline.document import Document
 
 
 class MarkdownReferenceCleaner:
     """移除 Markdown 文档中参考文献部分及其后内容。"""
 
+    _pattern = HEADING_TITLE
+
     def __init__(self, headings: Iterable[str] | None = None) -> None:
         default_headers = ("references", "reference", "参考文献")
-        self._headings = tuple(h.lower() for h in (headings or default_headers))
-        self._pattern = re.compile(r"^\s{0,3}###?\s+(.+)$")
+        self._headings = frozenset(h.lower() for h in (headings or default_headers))
 
     def run(self, document: Document) -> Document:
         """返回删去参考文献部分后的 Document，并同步更新磁盘上的 doc.md。"""
+        if self._trim(document):
+            self._write_back(document)
+            logger.info("[Cleaner] 已移除参考文献及其后内容")
+        return document
+
+    async def arun(self, document: Document) -> Document:
+        """run 的异步版本，写回 doc.md 在线程池中执行，不阻塞事件循环。"""
+        if self._trim(document):
+            await asyncio.to_thread(self._write_back, document)
+            logger.info("[Cleaner] 已移除参考文献及其后内容")
+        return document
+
+    def _trim(self, document: Document) -> bool:
+        """就地截断参考文献及其后内容，返回是否有改动。"""
         content = document.content
         cutoff = self._find_cutoff(content)
         if cutoff is None:
             logger.info("[Cleaner] 未检测到参考文献标题，保持原文不变")
-            return document
+            return False
 
-        trimmed = content[:cutoff].rstrip() + "\n"
-        document.content = trimmed
-        self._write_back(document)
-        logger.info("[Cleaner] 已移除参考文献及其后内容")
-        return document
+        document.content = content[:cutoff].rstrip() + "\n"
+        return True
 
     def _find_cutoff(self, content: str) -> int | None:
-        offset = 0
-        for line in content.splitlines(keepends=True):
-            match = self._pattern.match(line)
-            if match and match.group(1).strip().lower() in self._headings:
-                return offset
-            offset += len(line)
-        return None
+        pos = 0
+        length = len(content)
+        while True:
+            # 用 str.find 直接跳到下一个 '#'，不含 '#' 的行整段跳过
+            hash_pos = content.find("#", pos)
+            if hash_pos == -1:
+                return None
+            line_start = content.rfind("\n", pos, hash_pos) + 1 or pos
+            eol = content.find("\n", hash_pos)
+            eol = length if eol == -1 else eol + 1
+            # 标题前至多 3 个空白，'#' 不在行首 4 个字符内的行无需进入正则
+            if hash_pos - line_start <= 3:
+                match = self._pattern.match(content, line_start, eol)
+                if match and match.group(1).strip().lower() in self._headings:
+                    return line_start
+            pos = eol
 
     def _write_back(self, document: Document) -> None:
         output_dir = document.metadata.get("output_dir") if document.metadata else None
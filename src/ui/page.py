@@ -1,12 +1,18 @@
 import gradio as gr
 import os
 import time
+from functools import lru_cache
 
 from gradio_pdf import PDF
 
 # ==========================================
 # 1. 核心处理逻辑 (模拟解析和总结)
 # ==========================================
+@lru_cache(maxsize=32)
+def _file_info(file_path):
+    """返回 (文件名, 大小KB)，同一文件重复解析时免去重复的 stat 调用；上传新文件时清空"""
+    return os.path.basename(file_path), os.path.getsize(file_path) / 1024
+
 def mock_parse(file_obj):
     if file_obj is None:
         return "请先上传文件"
@@ -17,25 +23,30 @@ def mock_parse(file_obj):
     else:
         file_path = file_obj
 
-    filename = os.path.basename(file_path)
+    filename, size_kb = _file_info(file_path)
     
     print(f"正在解析文件: {filename}...")
-    time.sleep(1) 
+    # 设置 PDF_SUMMARY_FAST 时跳过模拟耗时，便于测试与基准测量
+    if not os.environ.get("PDF_SUMMARY_FAST"):
+        time.sleep(1) 
     
-    return f"""# {filename} 解析结果\n\n**文件名**: {filename}\n**文件大小**: {os.path.getsize(file_path)/1024:.1f} KB\n\n这里是模拟的解析内容..."""
+    return f"""# {filename} 解析结果\n\n**文件名**: {filename}\n**文件大小**: {size_kb:.1f} KB\n\n这里是模拟的解析内容..."""
 
 def mock_summarize(md_content):
     if not md_content:
         return "无内容"
         
     print("正在生成总结...")
-    time.sleep(1)
+    if not os.environ.get("PDF_SUMMARY_FAST"):
+        time.sleep(1)
     return f"【AI 总结】\n这是一份关于该文档的总结...\n\n基于内容片段：{md_content[:20]}..."
 
 # ==========================================
 # 2. 预览逻辑
 # ==========================================
 def display_pdf(file_obj):
+    # 文件发生变化，缓存的文件信息可能已过期
+    _file_info.cache_clear()
     if file_obj is None:
         return None
     return file_obj.name if hasattr(file_obj, 'name') else file_obj
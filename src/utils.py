@@ -1,6 +1,14 @@
 import os
 import sys
-import base64
+
+try:
+    # pybase64 提供 SIMD 加速的编码实现，并可直接返回 str 省去 bytes -> str 的拷贝
+    from pybase64 import b64encode, b64encode_as_string
+except ImportError:
+    from base64 import b64encode
+
+    def b64encode_as_string(s: bytes) -> str:
+        return b64encode(s).decode("ascii")
 
 def img2base64(image_path: str) -> str:
     """
@@ -14,4 +22,4 @@ def img2base64(image_path: str) -> str:
         raise FileNotFoundError(f"Image file not found: {image_path}")
         
     with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode('utf-8')
\ No newline at end of file
+        return b64encode_as_string(image_file.read())
\ No newline at end of file
@@ -3,10 +3,17 @@ import os
 import sys
 
 from unittest.mock import MagicMock, patch, AsyncMock
+from base import llm
 from base.llm import LLMClient
 from base.message import Message
 
 class TestLLMClient:
+
+    @pytest.fixture(autouse=True)
+    def clear_client_pool(self):
+        """隔离各测试间共享的底层客户端"""
+        yield
+        llm._SYNC_POOL.clear()
     
     @pytest.fixture
     def mock_env(self, monkeypatch):
@@ -58,6 +65,24 @@ class TestLLMClient:
         assert normalized[0] == {"role": "user", "content": "hello"}
         assert normalized[1] == {"role": "assistant", "content": "hi"}
 
+    def test_normalize_messages_cached(self, llm_client):
+        """测试 Message 序列化结果缓存及失效"""
+        msg = Message.user("hello")
+        first = llm_client._normalize_messages([msg])[0]
+        assert llm_client._normalize_messages([msg])[0] == first
+
+        # 修改返回的字典不影响后续序列化结果
+        first["role"] = "assistant"
+        assert msg.to_openai_dict() == {"role": "user", "content": "hello"}
+
+        msg.add_text(" world")
+        updated = llm_client._normalize_messages([msg])[0]
+        assert updated is not first
+        assert updated["content"][-1] == {"type": "text", "text": " world"}
+
+        msg.content = "replaced"
+        assert llm_client._normalize_messages([msg])[0]["content"] == "replaced"
+
     def test_normalize_messages_with_dicts(self, llm_client):
         """测试字典列表的标准化"""
         msgs = [{"role": "user", "content": "hello"}]
@@ -73,6 +98,17 @@ class TestLLMClient:
         assert params["temperature"] == 0.7
         assert params["messages"][0]["content"] == "test"
         assert params["stream"] is True
+        assert "max_tokens" not in params
+
+    def test_build_request_params_max_tokens(self, mock_env):
+        """测试 max_tokens 进入请求参数，且可被调用参数覆盖"""
+        client = LLMClient(max_tokens=100)
+        params = client._build_request_params([Message.user("test")])
+        assert params["max_tokens"] == 100
+
+        params = client._build_request_params([Message.user("test")], max_tokens=10, temperature=0.1)
+        assert params["max_tokens"] == 10
+        assert params["temperature"] == 0.1
 
     @patch("base.llm.OpenAI")
     def test_chat_sync(self, mock_openai_cls, llm_client):
@@ -156,3 +192,62 @@ class TestLLMClient:
         
         assert has_text
         assert has_image
+
+    @patch("base.llm.OpenAI")
+    def test_sync_client_shared(self, mock_openai_cls, mock_env):
+        """测试相同配置的客户端共享底层连接，最后一个释放时关闭"""
+        first = LLMClient()
+        second = LLMClient()
+        other = LLMClient(base_url="https://other.api/v1")
+
+        assert first.sync_client is second.sync_client
+        mock_openai_cls.side_effect = lambda **kwargs: MagicMock()
+        assert other.sync_client is not first.sync_client
+
+        shared = first.sync_client
+        first.close()
+        shared.close.assert_not_called()
+        second.close()
+        shared.close.assert_called_once()
+
+    def test_aclose(self, llm_client):
+        """测试 aclose 释放同步与异步客户端"""
+        import asyncio
+
+        async def run_test():
+            with patch("base.llm.OpenAI") as mock_openai_cls, \
+                 patch("base.llm.AsyncOpenAI") as mock_async_cls:
+                mock_async_cls.return_value.close = AsyncMock()
+                _ = llm_client.sync_client
+                _ = llm_client.async_client
+
+                await llm_client.aclose()
+
+                mock_openai_cls.return_value.close.assert_called_once()
+                mock_async_cls.return_value.close.assert_awaited_once()
+                assert llm_client._sync_client is None
+                assert llm_client._async_client is None
+
+        asyncio.run(run_test())
+
+    def test_async_client_per_loop(self, mock_env):
+        """测试异步客户端按事件循环创建，跨 asyncio.run 调用不复用旧循环的连接"""
+        import asyncio
+
+        with patch("base.llm.AsyncOpenAI") as mock_async_cls:
+            mock_async_cls.side_effect = lambda **kwargs: MagicMock(close=AsyncMock())
+
+            async def get_clients(*clients):
+                return [(c.async_client, c.async_client) for c in clients]
+
+            first, second = LLMClient(), LLMClient()
+            (a1, a1_again), (b1, _) = asyncio.run(get_clients(first, second))
+            assert a1 is a1_again
+            assert a1 is not b1
+
+            # 新的事件循环中重新创建，旧客户端不在新循环中关闭
+            [(a2, _)] = asyncio.run(get_clients(first))
+            assert a2 is not a1
+            asyncio.run(first.aclose())
+            a2.close.assert_not_called()
+            assert first._async_client is None
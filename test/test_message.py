@@ -0,0 +1,27 @@
+import copy
+
+from base.message import Message
+
+
+class TestMessage:
+
+    def test_model_copy_resets_cache(self):
+        """测试 model_copy 更新内容后副本不沿用原消息的序列化缓存"""
+        msg = Message.user("a")
+        assert msg.to_openai_dict() == {"role": "user", "content": "a"}
+        assert str(msg) == "[user] a"
+
+        copied = msg.model_copy(update={"content": "b"})
+
+        assert copied.to_openai_dict() == {"role": "user", "content": "b"}
+        assert str(copied) == "[user] b"
+        assert msg.to_openai_dict() == {"role": "user", "content": "a"}
+
+    def test_copy_then_modify(self):
+        """测试复制后修改内容，缓存随之失效"""
+        msg = Message.user("a")
+        str(msg)
+        for copied in (copy.copy(msg), copy.deepcopy(msg), msg.model_copy(deep=True)):
+            copied.content = "b"
+            assert str(copied) == "[user] b"
+        assert str(msg) == "[user] a"
@@ -19,6 +19,18 @@ class TestPaddleOCRClient:
         client = PaddleOCRClient()
         assert client.token == "test-token"
         assert client.api_url == "https://api.test.com"
+        assert client.concurrency == PaddleOCRClient.DEFAULT_CONCURRENCY
+
+    def test_init_concurrency(self, mock_env, monkeypatch):
+        monkeypatch.setenv("PADDLE_OCR_CONCURRENCY", "3")
+        assert PaddleOCRClient().concurrency == 3
+        assert PaddleOCRClient(concurrency=5).concurrency == 5
+
+        with pytest.raises(ValueError, match="Concurrency must be at least 1"):
+            PaddleOCRClient(concurrency=0)
+        monkeypatch.setenv("PADDLE_OCR_CONCURRENCY", "-1")
+        with pytest.raises(ValueError, match="Concurrency must be at least 1"):
+            PaddleOCRClient()
 
     def test_init_missing_token(self, monkeypatch):
         monkeypatch.delenv("PADDLE_OCR_TOKEN", raising=False)
@@ -54,59 +66,130 @@ class TestPaddleOCRClient:
             # Mock 依赖
             with patch("os.path.exists", side_effect=lambda p: p == "test.pdf"), \
                  patch("builtins.open", mock_open(read_data=b"pdf-content")) as mock_file, \
+                 patch("os.path.getsize", return_value=11), \
                  patch("os.makedirs") as mock_makedirs, \
                  patch("shutil.rmtree") as mock_rmtree, \
+                 patch("aiofiles.open") as mock_aio_open, \
                  patch("httpx.AsyncClient") as mock_httpx_cls:
 
+                mock_image_file = AsyncMock()
+                mock_aio_open.return_value.__aenter__.return_value = mock_image_file
+
                 # 设置 httpx Mock
                 mock_client_instance = AsyncMock()
-                mock_httpx_cls.return_value.__aenter__.return_value = mock_client_instance
+                mock_client_instance.is_closed = False
+                mock_httpx_cls.return_value = mock_client_instance
                 
                 # 模拟 POST 响应
                 mock_post_response = MagicMock()
                 mock_post_response.status_code = 200
-                mock_post_response.json.return_value = mock_api_response
+                mock_post_response.content = json.dumps(mock_api_response).encode()
                 mock_client_instance.post.return_value = mock_post_response
 
-                # 模拟 GET 响应 (图片下载)
+                # 模拟 GET 流式响应 (图片下载)
+                async def aiter_bytes(chunk_size=None):
+                    yield b"image-content"
+
                 mock_get_response = MagicMock()
                 mock_get_response.status_code = 200
-                mock_get_response.content = b"image-content"
-                mock_client_instance.get.return_value = mock_get_response
+                mock_get_response.aiter_bytes = aiter_bytes
+                mock_client_instance.stream = MagicMock()
+                mock_client_instance.stream.return_value.__aenter__.return_value = mock_get_response
 
                 # 执行测试
-                files = await client.parse("test.pdf", output_dir="out")
+                output_dir = await client.parse("test.pdf", output_dir="out")
 
                 # 验证结果
-                assert len(files) == 2 # doc_0.md 和 doc.md
-                assert "out/test/doc_0.md" in files
-                assert "out/test/doc.md" in files
+                assert output_dir == os.path.join("out", "test")
 
                 # 验证 API 调用
                 mock_client_instance.post.assert_called_once()
                 
                 # 验证图片下载调用 (1个内容图 + 1个布局图)
-                assert mock_client_instance.get.call_count == 2
+                assert mock_client_instance.stream.call_count == 2
                 
-                # 验证文件写入
-                # 1. 读取PDF
-                # 2. 写入 doc_0.md
-                # 3. 写入 img1.jpg
-                # 4. 写入 layout_0.jpg
-                # 5. 写入 doc.md
-                assert mock_file.call_count >= 5
+                # 验证文件写入 (PDF 由请求体生成器流式读取，此处 post 被 mock 不会触发)
+                # 1. 写入 doc_0.md
+                # 2. 写入 doc.md
+                assert mock_file.call_count >= 2
+                # 图片经 aiofiles 流式写入: img1.jpg 与 layout.jpg_0.jpg
+                assert mock_aio_open.call_count == 2
+                mock_image_file.write.assert_awaited_with(b"image-content")
+        asyncio.run(run_test())
+
+    def test_client_reused(self, client):
+        import asyncio
+        async def run_test():
+            with patch("httpx.AsyncClient") as mock_httpx_cls:
+                mock_client_instance = AsyncMock()
+                mock_client_instance.is_closed = False
+                mock_httpx_cls.return_value = mock_client_instance
+
+                assert client._get_client() is client._get_client()
+                mock_httpx_cls.assert_called_once()
+
+                await client.aclose()
+                mock_client_instance.aclose.assert_awaited_once()
+                assert client._client is None
         asyncio.run(run_test())
 
+    def test_semaphore_per_loop(self, client, tmp_path):
+        import asyncio
+        async def get_semaphores():
+            client._get_client()
+            first = client._semaphore
+            client._get_client()
+            return first, client._semaphore
+
+        with patch("httpx.AsyncClient") as mock_httpx_cls:
+            mock_httpx_cls.return_value.is_closed = False
+            first, again = asyncio.run(get_semaphores())
+            assert first is again
+            # 新的事件循环使用新的信号量
+            other, _ = asyncio.run(get_semaphores())
+            assert other is not first
+
+        # parse 之外也可直接调用下载方法
+        async def aiter_bytes(chunk_size=None):
+            yield b"image-content"
+
+        mock_response = MagicMock(status_code=200, aiter_bytes=aiter_bytes)
+        mock_http = MagicMock()
+        mock_http.stream.return_value.__aenter__.return_value = mock_response
+        save_path = tmp_path / "img.jpg"
+        asyncio.run(client._download_and_save(mock_http, "http://img", str(save_path)))
+        assert save_path.read_bytes() == b"image-content"
+
+    def test_iter_payload(self, client, tmp_path):
+        import asyncio
+        import base64
+        file_path = tmp_path / "test.pdf"
+        file_bytes = os.urandom(client.UPLOAD_CHUNK_SIZE * 2 + 7)
+        file_path.write_bytes(file_bytes)
+
+        async def run_test():
+            prefix = b'{"file":"'
+            suffix = b'","fileType":0}'
+            return b"".join([chunk async for chunk in client._iter_payload(str(file_path), prefix, suffix)])
+
+        body = asyncio.run(run_test())
+        payload = json.loads(body)
+        assert base64.b64decode(payload["file"]) == file_bytes
+        assert payload["fileType"] == 0
+        assert len(payload["file"]) == 4 * ((len(file_bytes) + 2) // 3)
+
     def test_parse_api_error(self, client):
         import asyncio
         async def run_test():
             with patch("os.path.exists", side_effect=lambda p: p == "test.pdf"), \
                  patch("builtins.open", mock_open(read_data=b"pdf-content")), \
+                 patch("os.path.getsize", return_value=11), \
                  patch("os.makedirs"), \
                  patch("httpx.AsyncClient") as mock_httpx_cls:
 
                 mock_client_instance = AsyncMock()
-                mock_httpx_cls.return_value.__aenter__.return_value = mock_client_instance
+                mock_client_instance.is_closed = False
+                mock_httpx_cls.return_value = mock_client_instance
                 
                 mock_response = MagicMock()
                 mock_response.status_code = 500
@@ -122,15 +205,17 @@ class TestPaddleOCRClient:
         async def run_test():
             with patch("os.path.exists", side_effect=lambda p: p == "test.pdf"), \
                  patch("builtins.open", mock_open(read_data=b"pdf-content")), \
+                 patch("os.path.getsize", return_value=11), \
                  patch("os.makedirs"), \
                  patch("httpx.AsyncClient") as mock_httpx_cls:
 
                 mock_client_instance = AsyncMock()
-                mock_httpx_cls.return_value.__aenter__.return_value = mock_client_instance
+                mock_client_instance.is_closed = False
+                mock_httpx_cls.return_value = mock_client_instance
                 
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = {"result": {}} # 空结果
+                mock_response.content = b'{"result": {}}' # 空结果
                 mock_client_instance.post.return_value = mock_response
 
                 files = await client.parse("test.pdf")
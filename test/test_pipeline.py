@@ -0,0 +1,146 @@
+import pytest
+
+from pipeline import (
+    Document,
+    ImageData,
+    MarkdownChunkBuilder,
+    MarkdownDocumentBuilder,
+    MarkdownReferenceCleaner,
+)
+
+
+class TestMarkdownChunkBuilder:
+
+    @pytest.fixture
+    def chunker(self):
+        return MarkdownChunkBuilder()
+
+    def test_split_numbered_headings(self, chunker):
+        """测试按编号标题切片，`## 1.1` 等子节标题不切分"""
+        content = (
+            "preface\n"
+            "## 1. Intro\nintro text\n"
+            "## 1.1 Background\nbackground text\n"
+            "### 2 Methods\nmethods text\n"
+            "#### 3. Deep\ndeep text\n"
+        )
+        chunks = chunker.split(Document(content=content, metadata={}))
+
+        assert [c.content.splitlines()[0] for c in chunks] == ["preface", "## 1. Intro", "### 2 Methods"]
+        assert "## 1.1 Background" in chunks[1].content
+        assert "#### 3. Deep" in chunks[2].content
+        assert [c.chunk_index for c in chunks] == [0, 1, 2]
+        assert all(c.doc_id == chunks[0].doc_id for c in chunks)
+
+    def test_split_indented_and_cjk_separator(self, chunker):
+        """测试缩进标题与全角空格分隔的标题"""
+        content = "preface\n   ## 1　引言\nabc\n## 2　方法\ndef\n    ## 3. 代码块\n"
+        chunks = chunker.split(Document(content=content, metadata={}))
+
+        assert len(chunks) == 3
+        assert chunks[1].content.startswith("## 1　引言")
+        # 缩进超过 3 个空格不视为标题
+        assert chunks[2].content.endswith("## 3. 代码块")
+
+    def test_split_without_heading(self, chunker):
+        """测试无编号标题时整体作为单块"""
+        chunks = chunker.split(Document(content="just text\n## Abstract\n", metadata={}))
+        assert len(chunks) == 1
+        assert chunks[0].content == "just text\n## Abstract"
+
+    def test_images_attributed_to_chunk(self, chunker):
+        """测试图片归入引用它的文档块"""
+        fig1 = ImageData(raw=b"fig1", metadata={"relative_path": "imgs/fig1.jpg"}, path="/doc/imgs/fig1.jpg")
+        fig2 = ImageData(raw=b"fig2", metadata={"relative_path": "imgs/fig2.jpg"}, path="/doc/imgs/fig2.jpg")
+        content = (
+            '<img src="imgs/fig1.jpg">\n'
+            "## 1. Intro\n"
+            '<IMG SRC=\'imgs/fig2.jpg\'>\n'
+            '<img src="imgs/fig2.jpg">\n'
+            "## 2. Results\nno figures\n"
+            "## 3. Discussion\n"
+            '<img src="imgs/fig1.jpg">\n'
+        )
+        chunks = chunker.split(Document(content=content, metadata={}, images=[fig1, fig2]))
+
+        assert [c.images for c in chunks] == [[fig1], [fig2], [], [fig1]]
+        assert chunks[3].images[0] is fig1
+        assert chunks[0].images[0].data == "ZmlnMQ=="
+
+
+class TestMarkdownDocumentBuilder:
+
+    def test_build_collects_images(self, tmp_path):
+        """测试构建文档时去重读取图片，缺失图片跳过"""
+        target_dir = tmp_path / "paper"
+        (target_dir / "imgs").mkdir(parents=True)
+        (target_dir / "imgs" / "a.jpg").write_bytes(b"image-a")
+        (target_dir / "doc.md").write_text(
+            '<img src="imgs/a.jpg">\n<img src="imgs/missing.jpg">\n<img src="imgs/a.jpg/b.jpg">\n<img src="imgs/a.jpg">\n',
+            encoding="utf-8",
+        )
+
+        document = MarkdownDocumentBuilder(output_root=str(tmp_path)).build("paper")
+
+        assert len(document.images) == 1
+        image = document.images[0]
+        assert image.raw == b"image-a"
+        assert image.metadata["relative_path"] == "imgs/a.jpg"
+        assert image.path == str((target_dir / "imgs" / "a.jpg").resolve())
+
+    def test_build_missing_doc(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="doc.md not found"):
+            MarkdownDocumentBuilder(output_root=str(tmp_path)).build("missing")
+
+
+class TestMarkdownReferenceCleaner:
+
+    @pytest.fixture
+    def cleaner(self):
+        return MarkdownReferenceCleaner()
+
+    @pytest.mark.parametrize(
+        "content, expected",
+        [
+            ("body\n## References\n[1] a\n", "body\n"),
+            ("body\n   ### reference  \n[1] a\n", "body\n"),
+            ("body\r\n## REFERENCES\r\n[1] a\r\n", "body\n"),
+            ("正文\n##　参考文献\n[1] a\n", "正文\n"),
+            ("正文\n## 参考文献\r\n[1] a\n", "正文\n"),
+        ],
+    )
+    def test_run_removes_references(self, cleaner, content, expected):
+        """测试缩进、CRLF 与全角空格分隔的参考文献标题均可识别"""
+        document = Document(content=content, metadata={})
+        assert cleaner.run(document).content == expected
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "body\n    ## References\n",
+            "body\n# References\n",
+            "body\n#### References\n",
+            "body\n## References and notes\n",
+            "body\nx ## References\n",
+            "body\n##References\n",
+        ],
+    )
+    def test_run_keeps_non_matching(self, cleaner, content):
+        """测试非参考文献标题或格式不符时保持原文"""
+        document = Document(content=content, metadata={})
+        assert cleaner.run(document).content == content
+
+    def test_run_writes_back(self, cleaner, tmp_path):
+        """测试截断结果写回 doc.md"""
+        doc_path = tmp_path / "doc.md"
+        doc_path.write_text("body\n## References\n[1] a\n", encoding="utf-8")
+        document = Document(content=doc_path.read_text(encoding="utf-8"), metadata={"output_dir": str(tmp_path)})
+
+        cleaner.run(document)
+
+        assert doc_path.read_text(encoding="utf-8") == "body\n"
+
+    def test_custom_headings(self):
+        cleaner = MarkdownReferenceCleaner(headings=["Appendix"])
+        document = Document(content="body\n## appendix\nx\n## References\n", metadata={})
+        assert cleaner.run(document).content == "body\n"